@@ -1,77 +1,89 @@
 import pcbnew
 import os.path
 import wx
-from time import sleep
-from threading import Thread
+from threading import Thread, Event, Lock
+from time import monotonic
 import sys
 import traceback
+import queue
+import functools
+import itertools
+from collections import deque
 
 try:
     if __name__ == "__main__":
         from impart_gui import impartGUI
         from KiCadImport import import_lib
         from impart_helper_func import filehandler, config_handler, KiCad_Settings
+        from impart_helper_func import start_zip_watcher
         from impart_migration import find_old_lib_files, convert_lib_list
     else:
         # relative import is required in kicad
         from .impart_gui import impartGUI
         from .KiCadImport import import_lib
         from .impart_helper_func import filehandler, config_handler, KiCad_Settings
+        from .impart_helper_func import start_zip_watcher
         from .impart_migration import find_old_lib_files, convert_lib_list
 except Exception as e:
     print(traceback.format_exc())
 
+script_dir = os.path.dirname(os.path.abspath(__file__))
+ICON_FILE = os.path.join(script_dir, "icon_small.png")
+ICON_FILE_RED = os.path.join(script_dir, "icon_small_red.png")
 
-EVT_UPDATE_ID = wx.NewIdRef()
+SUPPORTED_LIBRARIES = ("Octopart", "Samacsys", "UltraLibrarian", "Snapeda", "EasyEDA")
+# (name, symbol lib, symbol lib with old KiCad 6 name, converted symbol lib, footprint lib)
+LIBRARY_PROBES = tuple(
+    (
+        name,
+        name + ".kicad_sym",
+        name + "_kicad_sym.kicad_sym",
+        name + "_old_lib.kicad_sym",
+        name + ".pretty",
+    )
+    for name in SUPPORTED_LIBRARIES
+)
 
+# symbol libraries in these formats are converted by convert_lib_list
+OLD_LIB_SUFFIXES = (".lib", "_kicad_sym.kicad_sym")
 
-def EVT_UPDATE(win, func):
-    win.Connect(-1, -1, EVT_UPDATE_ID, func)
+# keep the log window responsive during long import sessions
+MAX_LOG_LENGTH = 500_000
+LOG_TRUNCATE_LENGTH = 200_000
 
+MAX_PRINT_PARTS = 10_000  # older output is dropped from the backend buffer
+LOG_REFRESH_INTERVAL = 0.1  # seconds, at most 10 updates of the log window per second
+FILE_EVENT_SETTLE_TIME = 0.2  # seconds without new events before files are imported
 
-class ResultEvent(wx.PyEvent):
-    def __init__(self, data):
-        wx.PyEvent.__init__(self)
-        self.SetEventType(EVT_UPDATE_ID)
-        self.data = data
-
-
-class PluginThread(Thread):
-    def __init__(self, wxObject):
-        Thread.__init__(self)
-        self.wxObject = wxObject
-        self.stopThread = False
-        self.start()
-
-    def run(self):
-        lenStr = 0
-        global backend_h
-        while not self.stopThread:
-            if lenStr != len(backend_h.print_buffer):
-                self.report(backend_h.print_buffer)
-                lenStr = len(backend_h.print_buffer)
-            sleep(0.5)
-
-    def report(self, status):
-        wx.PostEvent(self.wxObject, ResultEvent(status))
+WARNING_STYLE = wx.KILL_OK | wx.ICON_WARNING
+WARNING_CANCEL_STYLE = WARNING_STYLE | wx.CANCEL
 
 
 class impart_backend:
 
     def __init__(self):
-        path2config = os.path.join(os.path.dirname(__file__), "config.ini")
+        path2config = os.path.join(script_dir, "config.ini")
         self.config = config_handler(path2config)
-        path_seting = pcbnew.SETTINGS_MANAGER().GetUserSettingsPath()
-        self.KiCad_Settings = KiCad_Settings(path_seting)
         self.runThread = False
+        self.stop_event = Event()
+        self.file_queue = queue.Queue()
+        self.task_queue = queue.Queue()
+        self.worker = None
+        self.board_frame = None  # PCB Editor frame whose destruction ends the import
         self.autoImport = False
         self.overwriteImport = False
         self.import_old_format = False
         self.autoLib = False
         self.folderhandler = filehandler(".")
-        self.print_buffer = ""
-        self.importer = import_lib()
-        self.importer.print = self.print2buffer
+        # (number, text) of the latest outputs, the numbers keep counting up
+        self.print_buffer_parts = deque(maxlen=MAX_PRINT_PARTS)
+        self.print_counter = itertools.count()
+        self.print_lock = Lock()  # keeps the numbers in order, guards readers
+        self.print_listeners = []  # called after new text was added to the buffer
+        self.dest_listing = (None, {})  # ((path, st_mtime_ns), name -> DirEntry)
+        self.import_check = (None, "")  # (state of folder and settings, checkImport msg)
+        self._importer = None
+        self._KiCad_Settings = None
 
         def version_to_tuple(version_str):
             return tuple(map(int, version_str.split('-')[0].split(".")))
@@ -96,90 +108,307 @@ class impart_backend:
             self.print2buffer(additional_information)
             self.print2buffer("\n##############################\n")
 
+    @property
+    def importer(self):
+        # only created once a library is actually imported
+        if self._importer is None:
+            self._importer = import_lib()
+            self._importer.print = self.print2buffer
+        return self._importer
+
+    @property
+    def KiCad_Settings(self):
+        # the settings manager is only asked once the settings are needed
+        return self.load_kicad_settings()
+
+    def load_kicad_settings(self):
+        if self._KiCad_Settings is None:
+            path_seting = pcbnew.SETTINGS_MANAGER().GetUserSettingsPath()
+            self._KiCad_Settings = KiCad_Settings(path_seting)
+        return self._KiCad_Settings
+
+    def clear_settings_cache(self):
+        # settings that were not loaded yet have nothing cached
+        if self._KiCad_Settings is not None:
+            self._KiCad_Settings.clear_cache()
+
     def print2buffer(self, *args):
-        for text in args:
-            self.print_buffer = self.print_buffer + str(text) + "\n"
+        part = "".join(str(text) + "\n" for text in args)
+        with self.print_lock:
+            self.print_buffer_parts.append((next(self.print_counter), part))
+        for listener in tuple(self.print_listeners):
+            listener()
+
+    def start_import(self, auto_import, on_first_pass=None):
+        self.runThread = auto_import
+        if auto_import:
+            self.watch_board_frame()
+        self.task_queue.put(on_first_pass)
+        if self.worker is None:
+            # one long-lived thread handles all imports one after the other
+            self.worker = Thread(
+                target=self.__import_worker__, daemon=True, name="impart-import"
+            )
+            self.worker.start()
 
-    def __find_new_file__(self):
+    def __import_worker__(self):
+        while True:
+            on_first_pass = self.task_queue.get()
+            self.stop_event.clear()
+            try:
+                self.__find_new_file__(on_first_pass)
+            except Exception as e:  # keep the worker alive for the next request
+                self.print2buffer(f"Error: {e}")
+                print(traceback.format_exc())
+
+    def stop_import(self):
+        self.runThread = False
+        self.stop_event.set()
+        self.file_queue.put(None)  # wakes up a waiting watcher loop
+
+    def watch_board_frame(self):
+        # the automatic import ends together with the PCB Editor, without
+        # the frame the import loop has to ask pcbnew for the board instead
+        if self.board_frame is not None:
+            return
+        frame = wx.FindWindowByName("PcbFrame")
+        if frame:
+            # not EVT_CLOSE: closing can still be cancelled (unsaved changes)
+            frame.Bind(wx.EVT_WINDOW_DESTROY, self.on_board_frame_destroy)
+            self.board_frame = frame
+
+    def on_board_frame_destroy(self, event):
+        event.Skip()
+        frame = self.board_frame
+        if frame is None or event.GetEventObject() is not frame:
+            return  # a child window was destroyed
+        frame.Unbind(wx.EVT_WINDOW_DESTROY, handler=self.on_board_frame_destroy)
+        self.board_frame = None
+        self.stop_import()
+
+    def __find_new_file__(self, on_first_pass=None):
         path = self.config.get_SRC_PATH()
 
         if not os.path.isdir(path):
+            if on_first_pass is not None:
+                on_first_pass()
             return 0
 
-        while True:
-            newfilelist = self.folderhandler.GetNewFiles(path)
-            for lib in newfilelist:
-                try:
-                    (res,) = self.importer.import_all(
-                        lib,
-                        overwrite_if_exists=self.overwriteImport,
-                        import_old_format=self.import_old_format,
-                    )
-                    self.print2buffer(res)
-                except AssertionError as e:
-                    self.print2buffer(e)
-                except Exception as e:
-                    self.print2buffer(e)
-                    backend_h.print2buffer(f"Error: {e}")
-                    backend_h.print2buffer("Python version " + sys.version)
-                    print(traceback.format_exc())
-                self.print2buffer("")
-
-            if not self.runThread:
-                break
-            if not pcbnew.GetBoard():
-                # print("pcbnew close")
+        # In automatic mode new files are reported by the operating system.
+        # Without watchdog the folder is scanned every second instead.
+        observer = None
+        if self.runThread:
+            observer = start_zip_watcher(path, self.file_queue)
+
+        newfilelist = self.folderhandler.GetNewFiles(path)
+        try:
+            while True:
+                # settings are only refreshed once per poll, not per file
+                overwrite = self.overwriteImport
+                import_old_format = self.import_old_format
+
+                # Archives are imported one after another on purpose: all parts of a
+                # vendor are merged into the same library files (read, modify, replace)
+                # and a worker process would start a second KiCad instead of Python.
+                for lib in newfilelist:
+                    msgs = []  # the result of a file is reported in one piece
+                    try:
+                        (res,) = self.importer.import_all(
+                            lib,
+                            overwrite_if_exists=overwrite,
+                            import_old_format=import_old_format,
+                        )
+                        msgs.append(res)
+                    except AssertionError as e:
+                        msgs.append(e)
+                    except Exception as e:
+                        msgs.append(e)
+                        msgs.append(f"Error: {e}")
+                        msgs.append("Python version " + sys.version)
+                        print(traceback.format_exc())
+                    msgs.append("")
+                    self.print2buffer(*msgs)
+
+                if on_first_pass is not None:
+                    on_first_pass()
+                    on_first_pass = None
+
+                if not self.runThread or self.stop_event.is_set():
+                    break
+                if self.board_frame is None and not pcbnew.GetBoard():
+                    # print("pcbnew close")
+                    break
+                if observer is not None:
+                    newfilelist = self.__wait_for_new_files__()
+                    if self.folderhandler.force_reimport:
+                        # the folders were changed in the dialog, the watcher
+                        # does not report the known files again
+                        newfilelist = self.folderhandler.GetNewFiles(path)
+                elif self.stop_event.wait(timeout=1.0):
+                    break
+                else:
+                    newfilelist = self.folderhandler.GetNewFiles(path)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def __wait_for_new_files__(self):
+        try:
+            paths = [self.file_queue.get(timeout=1.0)]
+        except queue.Empty:
+            return []
+        # a download causes several events (created, modified or closed while
+        # it is written, moved), the files are only checked once no event has
+        # arrived for a moment, i.e. once writing has stopped
+        while paths[-1] is not None:
+            try:
+                paths.append(self.file_queue.get(timeout=FILE_EVENT_SETTLE_TIME))
+            except queue.Empty:
                 break
-            sleep(1)
+        # None is only a wake-up call of stop_import
+        paths = dict.fromkeys(lib for lib in paths if lib)
+        return [lib for lib in paths if self.folderhandler.add_new_file(lib)]
 
 
-backend_h = impart_backend()
+backend_h = None
+
+
+def get_backend():
+    # KiCad loads the plugin at startup, the backend (KiCad settings,
+    # config file, importer) is only created when the dialog is opened
+    global backend_h
+    if backend_h is None:
+        backend_h = impart_backend()
+    return backend_h
+
+
+def list_dest_folder(DEST_PATH):
+    # one directory listing instead of a stat call per library file, it is
+    # reused as long as no file was added, removed or renamed in the folder
+    try:
+        key = (DEST_PATH, os.stat(DEST_PATH).st_mtime_ns)
+    except OSError:
+        return {}
+    if backend_h.dest_listing[0] == key:
+        return backend_h.dest_listing[1]
+    try:
+        with os.scandir(DEST_PATH) as it:
+            entries = {entry.name: entry for entry in it}
+    except OSError:
+        return {}
+    backend_h.dest_listing = (key, entries)
+    return entries
 
 
 def checkImport(add_if_possible=True):
-    libnames = ["Octopart", "Samacsys", "UltraLibrarian", "Snapeda", "EasyEDA"]
+    # runs in the import thread, the lock keeps the check and the entries it
+    # adds apart from the changes migrate_libs makes in the GUI thread
+    with backend_h.KiCad_Settings.lock:
+        return check_import_settings(add_if_possible)
+
+
+def check_import_settings(add_if_possible):
     setting = backend_h.KiCad_Settings
     DEST_PATH = backend_h.config.get_DEST_PATH()
 
+    # the result only depends on the library folder and the KiCad settings
+    # files, changes made by the check itself lead to a new check next time
+    try:
+        dest_mtime = os.stat(DEST_PATH).st_mtime_ns
+    except OSError:
+        dest_mtime = None
+    key = (DEST_PATH, dest_mtime, setting.get_version(), add_if_possible)
+    if backend_h.import_check[0] == key:
+        return backend_h.import_check[1]
+
     msg = ""
     msg += setting.check_GlobalVar(DEST_PATH, add_if_possible)
 
-    for name in libnames:
+    entries = list_dest_folder(DEST_PATH)
+
+    def isfile(name):
+        return name in entries and entries[name].is_file()
+
+    def isdir(name):
+        return name in entries and entries[name].is_dir()
+
+    for name, sym_lib, sym_lib_old, sym_lib_convert, footprint_lib in LIBRARY_PROBES:
         # The lines work but old libraries should not be added automatically
-        # libname = os.path.join(DEST_PATH, name + ".lib")
-        # if os.path.isfile(libname):
+        # if isfile(name + ".lib"):
         #     msg += setting.check_symbollib(name + ".lib", add_if_possible)
 
-        libdir = os.path.join(DEST_PATH, name + ".kicad_sym")
-        libdir_old = os.path.join(DEST_PATH, name + "_kicad_sym.kicad_sym")
-        libdir_convert_lib = os.path.join(DEST_PATH, name + "_old_lib.kicad_sym")
-        if os.path.isfile(libdir):
-            libname = name + ".kicad_sym"
-            msg += setting.check_symbollib(libname, add_if_possible)
-        elif os.path.isfile(libdir_old):
-            libname = name + "_kicad_sym.kicad_sym"
-            msg += setting.check_symbollib(libname, add_if_possible)
-
-        if os.path.isfile(libdir_convert_lib):
-            libname = name + "_old_lib.kicad_sym"
-            msg += setting.check_symbollib(libname, add_if_possible)
-
-        libdir = os.path.join(DEST_PATH, name + ".pretty")
-        if os.path.isdir(libdir):
+        if isfile(sym_lib):
+            msg += setting.check_symbollib(sym_lib, add_if_possible)
+        elif isfile(sym_lib_old):
+            msg += setting.check_symbollib(sym_lib_old, add_if_possible)
+
+        if isfile(sym_lib_convert):
+            msg += setting.check_symbollib(sym_lib_convert, add_if_possible)
+
+        if isdir(footprint_lib):
             msg += setting.check_footprintlib(name, add_if_possible)
+
+    backend_h.import_check = (key, msg)
     return msg
 
 
+def lib_dir_signature(lib_path):
+    """Names of all files in lib_path that can belong to an imported library"""
+    try:
+        with os.scandir(os.path.expanduser(lib_path)) as it:
+            return tuple(
+                sorted(
+                    entry.name
+                    for entry in it
+                    if entry.name.startswith(SUPPORTED_LIBRARIES) and entry.is_file()
+                )
+            )
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def scan_old_lib_files(lib_path, dir_signature):
+    # find_old_lib_files only depends on the file names, so the result stays
+    # valid as long as the signature of the folder is unchanged
+    return find_old_lib_files(folder_path=lib_path, libs=SUPPORTED_LIBRARIES)
+
+
+def confirm_warning(msg, title="WARNING", style=WARNING_STYLE):
+    # the context manager destroys the native dialog after use
+    with wx.MessageDialog(None, msg, title, style) as dlg:
+        return dlg.ShowModal() == wx.ID_OK
+
+
+def report_import_settings(msg):
+    msg += "\n\nMore information can be found in the README for the integration into KiCad.\n"
+    msg += "github.com/Steffen-W/Import-LIB-KiCad-Plugin"
+    msg += "\nSome configurations require a KiCad restart to be detected correctly."
+
+    if not confirm_warning(msg):
+        return
+
+    backend_h.print2buffer("\n##############################\n")
+    backend_h.print2buffer(msg)
+    backend_h.print2buffer("\n##############################\n")
+
+
 class impart_frontend(impartGUI):
     global backend_h
 
     def __init__(self, board, action):
         super(impart_frontend, self).__init__(None)
+        get_backend()
         self.board = board
         self.action = action
 
+        if wx.Platform == "__WXMSW__":
+            self.m_text.SetMaxLength(1 << 20)
+
         self.m_dirPicker_sourcepath.SetPath(backend_h.config.get_SRC_PATH())
         self.m_dirPicker_librarypath.SetPath(backend_h.config.get_DEST_PATH())
+        self.lib_path = self.m_dirPicker_librarypath.GetPath()  # see DirChange
 
         self.m_autoImport.SetValue(backend_h.autoImport)
         self.m_overwrite.SetValue(backend_h.overwriteImport)
@@ -191,29 +420,78 @@ class impart_frontend(impartGUI):
         else:
             self.m_button.Label = "Start"
 
-        EVT_UPDATE(self, self.updateDisplay)
-        self.Thread = PluginThread(self)  # only for text output
-
+        # text output: the backend notifies about new text, which is then
+        # appended in the GUI thread
+        self.reported = 0  # number of the first buffer entry not shown yet
+        self.update_pending = False
+        self.last_report = 0.0
+        backend_h.print_listeners.append(self.on_new_text)
+        self.report_new_text()
+
+        self.last_conversion = (None, [])  # (scan result, dry run of the conversion)
+        self.scan_in_flight = False
+        self.scan_pending = False
         self.test_migrate_possible()
 
-    def updateDisplay(self, status):
-        self.m_text.SetValue(status.data)
+    def updateDisplay(self, text):
+        if not self:  # the dialog was destroyed in the meantime
+            return
+        self.m_text.Freeze()
+        self.m_text.AppendText(text)
+        if self.m_text.GetLastPosition() > MAX_LOG_LENGTH:
+            # remove whole lines, the first visible line should not be cut off
+            ok, _, line = self.m_text.PositionToXY(LOG_TRUNCATE_LENGTH)
+            end = self.m_text.XYToPosition(0, line + 1) if ok else -1
+            if end < 0:
+                end = LOG_TRUNCATE_LENGTH
+            self.m_text.Remove(0, end)
         self.m_text.SetInsertionPointEnd()
+        self.m_text.Thaw()
+
+    def on_new_text(self):
+        # may be called from any thread, one pending update collects all
+        # text that arrives until the GUI thread gets to it
+        if self.update_pending:
+            return
+        self.update_pending = True
+        wx.CallAfter(self.report_new_text)
+
+    def report_new_text(self):
+        if not self:  # the dialog was destroyed in the meantime
+            return
+        wait = self.last_report + LOG_REFRESH_INTERVAL - monotonic()
+        if wait > 0:  # text arriving in the meantime is appended in one go
+            wx.CallLater(int(wait * 1000) + 1, self.report_new_text)
+            return
+        self.update_pending = False
+        # only the new entries at the end are read, the lock keeps the
+        # import thread from appending in the meantime
+        new_text = []
+        with backend_h.print_lock:
+            parts = backend_h.print_buffer_parts
+            for number, text in reversed(parts):
+                if number < self.reported:
+                    break
+                new_text.append(text)
+            if not new_text:
+                return
+            reported = parts[-1][0] + 1
+        new_text.reverse()
+        self.updateDisplay("".join(new_text))
+        self.reported = reported
+        self.last_report = monotonic()
 
     # def print(self, text):
     #     self.m_text.AppendText(str(text)+"\n")
 
     def on_close(self, event):
         if backend_h.runThread:
-            dlg = wx.MessageDialog(
-                None,
+            if not confirm_warning(
                 "The automatic import process continues in the background. "
                 + "If this is not desired, it must be stopped.\n"
                 + "As soon as the PCB Editor window is closed, the import process also ends.",
                 "WARNING: impart background process",
-                wx.KILL_OK | wx.ICON_WARNING,
-            )
-            if dlg.ShowModal() != wx.ID_OK:
+            ):
                 return
 
         backend_h.autoImport = self.m_autoImport.IsChecked()
@@ -221,7 +499,7 @@ class impart_frontend(impartGUI):
         backend_h.autoLib = self.m_check_autoLib.IsChecked()
         backend_h.import_old_format = self.m_check_import_all.IsChecked()
         # backend_h.runThread = False
-        self.Thread.stopThread = True  # only for text output
+        backend_h.print_listeners.remove(self.on_new_text)
         event.Skip()
 
     def BottonClick(self, event):
@@ -233,41 +511,40 @@ class impart_frontend(impartGUI):
         backend_h.import_old_format = self.m_check_import_all.IsChecked()
 
         if backend_h.runThread:
-            backend_h.runThread = False
+            backend_h.stop_import()
             self.m_button.Label = "Start"
             return
 
-        backend_h.runThread = False
-        backend_h.__find_new_file__()
-        self.m_button.Label = "Start"
-
-        if backend_h.autoImport:
-            backend_h.runThread = True
-            self.m_button.Label = "automatic import / press to stop"
-            x = Thread(target=backend_h.__find_new_file__, args=[])
-            x.start()
-
+        # the import always runs in the background; without automatic import
+        # the thread ends after the first pass
         add_if_possible = self.m_check_autoLib.IsChecked()
-        msg = checkImport(add_if_possible)
-        if msg:
-            msg += "\n\nMore information can be found in the README for the integration into KiCad.\n"
-            msg += "github.com/Steffen-W/Import-LIB-KiCad-Plugin"
-            msg += "\nSome configurations require a KiCad restart to be detected correctly."
-
-            dlg = wx.MessageDialog(None, msg, "WARNING", wx.KILL_OK | wx.ICON_WARNING)
-
-            if dlg.ShowModal() != wx.ID_OK:
+        # the settings manager of pcbnew is created here and not in the import thread
+        backend_h.load_kicad_settings()
+
+        def first_pass_done():
+            # runs in the import thread, only the dialog needs the GUI thread
+            try:
+                msg = checkImport(add_if_possible)
+            except Exception as e:  # must not end the automatic import
+                backend_h.print2buffer(f"Error: {e}")
+                print(traceback.format_exc())
                 return
+            if msg:
+                wx.CallAfter(report_import_settings, msg)
 
-            backend_h.print2buffer("\n##############################\n")
-            backend_h.print2buffer(msg)
-            backend_h.print2buffer("\n##############################\n")
+        backend_h.start_import(backend_h.autoImport, first_pass_done)
+        if backend_h.runThread:
+            self.m_button.Label = "automatic import / press to stop"
+        else:
+            self.m_button.Label = "Start"
         event.Skip()
 
     def DirChange(self, event):
         backend_h.config.set_SRC_PATH(self.m_dirPicker_sourcepath.GetPath())
-        backend_h.config.set_DEST_PATH(self.m_dirPicker_librarypath.GetPath())
-        backend_h.folderhandler.filelist = []
+        self.lib_path = self.m_dirPicker_librarypath.GetPath()
+        backend_h.config.set_DEST_PATH(self.lib_path)
+        backend_h.folderhandler.force_reimport = True
+        backend_h.clear_settings_cache()
         self.test_migrate_possible()
         event.Skip()
 
@@ -292,23 +569,54 @@ class impart_frontend(impartGUI):
             print(traceback.format_exc())
 
     def get_old_libfiles(self):
-        libpath = self.m_dirPicker_librarypath.GetPath()
-        libs = ["Octopart", "Samacsys", "UltraLibrarian", "Snapeda", "EasyEDA"]
-        return find_old_lib_files(folder_path=libpath, libs=libs)
+        libpath = self.lib_path
+        return scan_old_lib_files(libpath, lib_dir_signature(libpath))
 
-    def test_migrate_possible(self):
-        libs2migrate = self.get_old_libfiles()
+    def get_conversion_preview(self, libs2migrate):
+        # an unchanged library folder returns the same cached scan result
+        if self.last_conversion[0] is libs2migrate:
+            return self.last_conversion[1]
         conv = convert_lib_list(libs2migrate, drymode=True)
+        self.last_conversion = (libs2migrate, conv)
+        return conv
 
-        if len(conv):
-            self.m_button_migrate.Show()
-        else:
-            self.m_button_migrate.Hide()
+    def test_migrate_possible(self):
+        # the library folder is scanned in the background, a request during
+        # a running scan is handled once that scan is finished
+        if self.scan_in_flight:
+            self.scan_pending = True
+            return
+        self.scan_in_flight = True
+        self.scan_pending = False
+        libpath = self.lib_path
+        Thread(target=self.__migrate_scan__, args=[libpath], daemon=True).start()
+
+    def __migrate_scan__(self, libpath):
+        conv = []
+        try:
+            signature = lib_dir_signature(libpath)
+            # without a library in an old format there is nothing to convert
+            if signature and any(n.endswith(OLD_LIB_SUFFIXES) for n in signature):
+                libs2migrate = scan_old_lib_files(libpath, signature)
+                conv = self.get_conversion_preview(libs2migrate)
+        except Exception:
+            print(traceback.format_exc())
+        wx.CallAfter(self.show_migrate_button, len(conv) > 0)
+
+    def show_migrate_button(self, show):
+        if not self:  # the dialog was destroyed in the meantime
+            return
+        self.scan_in_flight = False
+        if self.m_button_migrate.IsShown() != show:
+            self.m_button_migrate.Show(show)
+            self.Layout()
+        if self.scan_pending:
+            self.test_migrate_possible()
 
     def migrate_libs(self, event):
         libs2migrate = self.get_old_libfiles()
 
-        conv = convert_lib_list(libs2migrate, drymode=True)
+        conv = self.get_conversion_preview(libs2migrate)
 
         def print2GUI(text):
             backend_h.print2buffer(text)
@@ -317,19 +625,18 @@ class impart_frontend(impartGUI):
             print2GUI("Error in migrate_libs()")
             return
 
-        SymbolTable = backend_h.KiCad_Settings.get_sym_table()
-        SymbolLibsUri = {lib["uri"]: lib for lib in SymbolTable}
+        SymbolLibsUri = backend_h.KiCad_Settings.get_sym_table_by_uri()
         libRename = []
 
         def lib_entry(lib):
             return "${KICAD_3RD_PARTY}/" + lib
 
-        msg = ""
+        msg_parts = []
         for line in conv:
             if line[1].endswith(".blk"):
-                msg += "\n" + line[0] + " rename to " + line[1]
+                msg_parts.append("\n" + line[0] + " rename to " + line[1])
             else:
-                msg += "\n" + line[0] + " convert to " + line[1]
+                msg_parts.append("\n" + line[0] + " convert to " + line[1])
                 if lib_entry(line[0]) in SymbolLibsUri:
                     entry = SymbolLibsUri[lib_entry(line[0])]
                     tmp = {
@@ -341,29 +648,34 @@ class impart_frontend(impartGUI):
 
         msg_lib = ""
         if len(libRename):
-            msg_lib += "The following changes must be made to the list of imported Symbol libs:\n"
-
-            for tmp in libRename:
-                msg_lib += f"\n{tmp['name']} : {tmp['oldURI']} \n-> {tmp['newURI']}"
-
-            msg_lib += "\n\n"
-            msg_lib += "It is necessary to adjust the settings of the imported symbol libraries in KiCad."
-            msg += "\n\n" + msg_lib
+            parts = [
+                "The following changes must be made to the list of imported Symbol libs:\n"
+            ]
+            parts.extend(
+                f"\n{tmp['name']} : {tmp['oldURI']} \n-> {tmp['newURI']}"
+                for tmp in libRename
+            )
+            parts.append("\n\n")
+            parts.append(
+                "It is necessary to adjust the settings of the imported symbol libraries in KiCad."
+            )
+            msg_lib = "".join(parts)
+            msg_parts.append("\n\n" + msg_lib)
 
-        msg += "\n\nBackup files are also created automatically. "
-        msg += "These are named '*.blk'.\nShould the changes be applied?"
+        msg_parts.append("\n\nBackup files are also created automatically. ")
+        msg_parts.append("These are named '*.blk'.\nShould the changes be applied?")
+        msg = "".join(msg_parts)
 
-        dlg = wx.MessageDialog(
-            None, msg, "WARNING", wx.KILL_OK | wx.ICON_WARNING | wx.CANCEL
-        )
-        if dlg.ShowModal() == wx.ID_OK:
-            print2GUI("Converted libraries:")
+        if confirm_warning(msg, style=WARNING_CANCEL_STYLE):
             conv = convert_lib_list(libs2migrate, drymode=False)
+            scan_old_lib_files.cache_clear()
+            lines = ["Converted libraries:"]
             for line in conv:
                 if line[1].endswith(".blk"):
-                    print2GUI(line[0] + " rename to " + line[1])
+                    lines.append(line[0] + " rename to " + line[1])
                 else:
-                    print2GUI(line[0] + " convert to " + line[1])
+                    lines.append(line[0] + " convert to " + line[1])
+            print2GUI("\n".join(lines))
         else:
             return
 
@@ -371,10 +683,7 @@ class impart_frontend(impartGUI):
             return
 
         msg_dlg = "\nShould the change be made automatically? A restart of KiCad is then necessary to apply all changes."
-        dlg2 = wx.MessageDialog(
-            None, msg_lib + msg_dlg, "WARNING", wx.KILL_OK | wx.ICON_WARNING | wx.CANCEL
-        )
-        if dlg2.ShowModal() == wx.ID_OK:
+        if confirm_warning(msg_lib + msg_dlg, style=WARNING_CANCEL_STYLE):
             for tmp in libRename:
                 print2GUI(f"\n{tmp['name']} : {tmp['oldURI']} \n-> {tmp['newURI']}")
                 backend_h.KiCad_Settings.sym_table_change_entry(
@@ -392,9 +701,8 @@ class ActionImpartPlugin(pcbnew.ActionPlugin):
     def defaults(self):
         self.set_LOGO()
 
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        if current_dir not in sys.path:
-            sys.path.append(current_dir)
+        if script_dir not in sys.path:
+            sys.path.append(script_dir)
 
     def set_LOGO(self, is_red=False):
         self.name = "impartGUI"
@@ -403,13 +711,9 @@ class ActionImpartPlugin(pcbnew.ActionPlugin):
         self.show_toolbar_button = True
 
         if not is_red:
-            self.icon_file_name = os.path.join(
-                os.path.dirname(__file__), "icon_small.png"
-            )
+            self.icon_file_name = ICON_FILE
         else:
-            self.icon_file_name = os.path.join(
-                os.path.dirname(__file__), "icon_small_red.png"
-            )
+            self.icon_file_name = ICON_FILE_RED
         self.dark_icon_file_name = self.icon_file_name
 
     def Run(self):
@@ -35,7 +35,7 @@ class impartGUI ( wx.Dialog ):
         self.m_button = wx.Button( self, wx.ID_ANY, u"Start", wx.DefaultPosition, wx.DefaultSize, 0 )
         bSizer.Add( self.m_button, 0, wx.ALL|wx.EXPAND, 5 )
 
-        self.m_text = wx.TextCtrl( self, wx.ID_ANY, wx.EmptyString, wx.DefaultPosition, wx.DefaultSize, wx.TE_BESTWRAP|wx.TE_MULTILINE )
+        self.m_text = wx.TextCtrl( self, wx.ID_ANY, wx.EmptyString, wx.DefaultPosition, wx.DefaultSize, wx.TE_MULTILINE|wx.TE_READONLY|wx.TE_RICH2|wx.HSCROLL|wx.TE_DONTWRAP )
         bSizer.Add( self.m_text, 1, wx.ALL|wx.EXPAND, 5 )
 
         self.m_staticline11 = wx.StaticLine( self, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, wx.LI_HORIZONTAL )
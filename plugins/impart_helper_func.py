@@ -3,41 +3,123 @@ import json
 import configparser
 from pathlib import Path
 import re
+from threading import RLock
 
 from s_expression_parse import readFile2var, parse_sexp, convert_list_to_dicts
 
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog is not part of the Python shipped with KiCad
+    Observer = None
+    FileSystemEventHandler = object
+
+ZIP_SUFFIX = ".zip"
+# the file is less than 50 MB and larger 1kB
+MIN_ZIP_SIZE = 1000
+MAX_ZIP_SIZE = 1000 * 1000 * 50
+
 
 class filehandler:
     def __init__(self, path):
         self.path = ""
-        self.filelist = []
+        self.filelist = set()  # names of the files already seen
+        self.force_reimport = False  # return known files once more on the next scan
         self.change_path(path)
 
     def change_path(self, newpath):
         if not os.path.isdir(newpath):
             newpath = "."
         if newpath != self.path:
-            self.filelist = []
+            self.filelist.clear()
         self.path = newpath
 
     def GetNewFiles(self, path):
         if path != self.path:
             self.change_path(path)
 
-        filelist = os.listdir(self.path)
-        filelist.sort()
+        reimport = self.force_reimport
+        self.force_reimport = False
+
         newFiles = []
-        for i in filelist:
-            if i not in self.filelist and i.endswith(".zip"):
-                pathtemp = os.path.join(self.path, i)
-                # the file is less than 50 MB and larger 1kB
-                if (os.path.getsize(pathtemp) < 1000 * 1000 * 50) and (
-                    os.path.getsize(pathtemp) > 1000
-                ):
-                    newFiles.append(pathtemp)
-                    self.filelist.append(i)
+        with os.scandir(self.path) as it:
+            for entry in it:
+                name = entry.name
+                # cheapest test first, the stat call last
+                if not name.endswith(ZIP_SUFFIX):
+                    continue
+                if name in self.filelist:
+                    if reimport:  # the size was already checked
+                        newFiles.append(entry.path)
+                    continue
+                try:
+                    # is_file() is answered from the directory listing on most systems
+                    if not entry.is_file():
+                        continue
+                    size = entry.stat().st_size
+                except OSError:
+                    continue
+                if MIN_ZIP_SIZE < size < MAX_ZIP_SIZE:
+                    newFiles.append(entry.path)
+                    self.filelist.add(name)
+        newFiles.sort()
         return newFiles
 
+    def add_new_file(self, path):
+        """Returns True if path is an unknown zip file of a suitable size and remembers it"""
+        name = os.path.basename(path)
+        if not name.endswith(ZIP_SUFFIX) or name in self.filelist:
+            return False
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return False
+        if not MIN_ZIP_SIZE < size < MAX_ZIP_SIZE:
+            return False
+        self.filelist.add(name)
+        return True
+
+
+class zip_watcher(FileSystemEventHandler):
+    """Puts the paths of zip files created, written or moved into the watched folder into a queue"""
+
+    def __init__(self, file_queue):
+        super().__init__()
+        self.file_queue = file_queue
+
+    def on_created(self, event):
+        self.__put__(event.src_path, event.is_directory)
+
+    def on_moved(self, event):
+        self.__put__(event.dest_path, event.is_directory)
+
+    def on_modified(self, event):
+        # a file that was too small when it was created is checked again
+        # while it grows, files already accepted are ignored by filehandler
+        self.__put__(event.src_path, event.is_directory)
+
+    def on_closed(self, event):
+        # only reported by inotify: the file is complete now, the other
+        # observers only report modifications while it is written
+        self.__put__(event.src_path, event.is_directory)
+
+    def __put__(self, path, is_directory):
+        if not is_directory and path.endswith(ZIP_SUFFIX):
+            self.file_queue.put(path)
+
+
+def start_zip_watcher(path, file_queue):
+    """Watches path for new zip files, returns None if watching is not possible"""
+    if Observer is None:
+        return None
+    observer = Observer()
+    try:
+        observer.schedule(zip_watcher(file_queue), path, recursive=False)
+        observer.start()
+    except OSError:  # e.g. inotify watch limit reached
+        return None
+    return observer
+
 
 class config_handler:
     def __init__(self, config_path):
@@ -66,6 +148,8 @@ class config_handler:
         return self.config["config"]["SRC_PATH"]
 
     def set_SRC_PATH(self, var):
+        if self.config["config"]["SRC_PATH"] == var:
+            return
         self.config["config"]["SRC_PATH"] = var
         self.save_config()
 
@@ -73,6 +157,8 @@ class config_handler:
         return self.config["config"]["DEST_PATH"]
 
     def set_DEST_PATH(self, var):
+        if self.config["config"]["DEST_PATH"] == var:
+            return
         self.config["config"]["DEST_PATH"] = var
         self.save_config()
 
@@ -87,11 +173,41 @@ class config_handler:
 class KiCad_Settings:
     def __init__(self, SettingPath):
         self.SettingPath = SettingPath
+        self.table_cache = {}  # path -> ((st_mtime_ns, st_size), parsed table)
+        self.sym_uri_cache = (None, {})  # (parsed sym table, uri -> entry)
+        # the import thread and the dialog both read and rewrite the settings
+        # files, every read-modify-write and cache update holds this lock
+        self.lock = RLock()
+
+    def clear_cache(self):
+        with self.lock:
+            self.table_cache.clear()
+            self.sym_uri_cache = (None, {})
+
+    def get_version(self):
+        """Changes as soon as one of the settings files checked by the plugin is written"""
+        version = []
+        for name in ("kicad_common.json", "sym-lib-table", "fp-lib-table"):
+            try:
+                stat = os.stat(os.path.join(self.SettingPath, name))
+                version.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                version.append(None)
+        return tuple(version)
 
     def get_sym_table(self):
         path = os.path.join(self.SettingPath, "sym-lib-table")
         return self.__parse_table__(path)
 
+    def get_sym_table_by_uri(self):
+        with self.lock:
+            SymbolTable = self.get_sym_table()
+            # only rebuilt when the table was parsed again
+            if self.sym_uri_cache[0] is not SymbolTable:
+                SymbolLibsUri = {lib["uri"]: lib for lib in SymbolTable}
+                self.sym_uri_cache = (SymbolTable, SymbolLibsUri)
+            return self.sym_uri_cache[1]
+
     def set_sym_table(self, libname: str, libpath: str):
         path = os.path.join(self.SettingPath, "sym-lib-table")
         self.__add_entry_sexp__(path, name=libname, uri=libpath)
@@ -110,9 +226,26 @@ class KiCad_Settings:
         self.__add_entry_sexp__(path, name=libname, uri=uri_lib)
 
     def __parse_table__(self, path):
+        with self.lock:
+            return self.__parse_table_locked__(path)
+
+    def __parse_table_locked__(self, path):
+        try:
+            stat = os.stat(path)
+            version = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            version = None
+
+        # the tables are parsed again only after they were changed on disk
+        cached = self.table_cache.get(path)
+        if cached and version is not None and cached[0] == version:
+            return cached[1]
+
         sexp = readFile2var(path)
         parsed = parse_sexp(sexp)
-        return convert_list_to_dicts(parsed)
+        table = convert_list_to_dicts(parsed)
+        self.table_cache[path] = (version, table)
+        return table
 
     def __update_uri_in_sexp__(
         self,
@@ -120,6 +253,10 @@ class KiCad_Settings:
         old_uri,
         new_uri,
     ):
+        with self.lock:
+            self.__update_uri_in_sexp_locked__(path, old_uri, new_uri)
+
+    def __update_uri_in_sexp_locked__(self, path, old_uri, new_uri):
         with open(path, "r") as file:
             data = file.readlines()
 
@@ -156,6 +293,10 @@ class KiCad_Settings:
         options="",
         descr="",
     ):
+        with self.lock:
+            self.__add_entry_sexp_locked__(path, name, uri, type, options, descr)
+
+    def __add_entry_sexp_locked__(self, path, name, uri, type, options, descr):
         table_entry = self.__parse_table__(path)
         entries = {lib["name"]: lib for lib in table_entry}
         if name in entries:
@@ -198,7 +339,7 @@ class KiCad_Settings:
     def set_kicad_common(self, kicad_common):
         path = os.path.join(self.SettingPath, "kicad_common.json")
 
-        with open(path, "w") as file:
+        with self.lock, open(path, "w") as file:
             json.dump(kicad_common, file, indent=2)
 
     def get_kicad_GlobalVars(self):
@@ -241,7 +382,7 @@ class KiCad_Settings:
 
         SymbolTable = self.get_sym_table()
         SymbolLibs = {lib["name"]: lib for lib in SymbolTable}
-        SymbolLibsUri = {lib["uri"]: lib for lib in SymbolTable}
+        SymbolLibsUri = self.get_sym_table_by_uri()
 
         temp_path = "${KICAD_3RD_PARTY}/" + SearchLib
 
@@ -271,9 +412,10 @@ class KiCad_Settings:
         GlobalVars = self.get_kicad_GlobalVars()
 
         def setup_kicad_common():
-            kicad_common = self.get_kicad_common()
-            kicad_common["environment"]["vars"]["KICAD_3RD_PARTY"] = LocalLibFolder
-            self.set_kicad_common(kicad_common)
+            with self.lock:
+                kicad_common = self.get_kicad_common()
+                kicad_common["environment"]["vars"]["KICAD_3RD_PARTY"] = LocalLibFolder
+                self.set_kicad_common(kicad_common)
 
         if GlobalVars and "KICAD_3RD_PARTY" in GlobalVars:
             if not GlobalVars["KICAD_3RD_PARTY"] == LocalLibFolder:
@@ -1,5 +1,6 @@
 from pathlib import Path
 import logging
+import os
 
 from kicad_cli import kicad_cli
 
@@ -15,18 +16,24 @@ def find_old_lib_files(
     folder_path = Path(folder_path).expanduser()
     found_files = {}
 
-    if not folder_path.exists():
+    # one directory listing; the checks for related files (.dcm, .blk, ...)
+    # are lookups in this set instead of separate stat calls
+    try:
+        with os.scandir(folder_path) as it:
+            file_names = {entry.name for entry in it if entry.is_file()}
+    except OSError:
         return found_files
 
-    for file in folder_path.iterdir():
-        if not file.is_file():
-            continue
+    def existing(path: Path):
+        return path.name in file_names
 
-        if not (file.name.endswith(".lib") or file.name.endswith(".kicad_sym")):
+    for name in sorted(file_names):
+        if not (name.endswith(".lib") or name.endswith(".kicad_sym")):
             continue
 
         for lib in libs:
-            if file.name.startswith(lib):
+            if name.startswith(lib):
+                file = folder_path / name
 
                 if lib in found_files:
                     entry = found_files[lib]
@@ -34,43 +41,43 @@ def find_old_lib_files(
                     entry = {}
 
                 # Check whether the file ends with ".lib"
-                if file.name.endswith(".lib"):
+                if name.endswith(".lib"):
                     entry["old_lib"] = file
 
                     blk_file = file.with_suffix(".lib.blk")
-                    if blk_file.exists() and blk_file.is_file():
+                    if existing(blk_file):
                         entry["old_lib_blk"] = blk_file  # backup file
 
                     dcm_file = file.with_suffix(".dcm")
-                    if dcm_file.exists() and dcm_file.is_file():
+                    if existing(dcm_file):
                         entry["old_lib_dcm"] = dcm_file  # description file
 
                 # Check whether the file with the old kicad v6 name exists
-                elif file.name.endswith("_kicad_sym.kicad_sym"):
+                elif name.endswith("_kicad_sym.kicad_sym"):
                     entry["oldV6"] = file
 
                     dcm_file = file.with_suffix(".dcm")
-                    if dcm_file.exists() and dcm_file.is_file():
+                    if existing(dcm_file):
                         entry["oldV6_dcm"] = dcm_file  # description file
 
                     blk_file = file.with_suffix(".kicad_sym.blk")
-                    if blk_file.exists() and blk_file.is_file():
+                    if existing(blk_file):
                         entry["oldV6_blk"] = blk_file  # backup file
 
                 # Check whether the file with the normal ".kicad_sym" extension exists
-                elif file.name.endswith(".kicad_sym"):
+                elif name.endswith(".kicad_sym"):
                     entry["V6"] = file
 
                     dcm_file = file.with_suffix(".dcm")
-                    if dcm_file.exists() and dcm_file.is_file():
+                    if existing(dcm_file):
                         entry["V6_dcm"] = dcm_file  # description file
 
                     blk_file = file.with_suffix(".kicad_sym.blk")
-                    if blk_file.exists() and blk_file.is_file():
+                    if existing(blk_file):
                         entry["V6_blk"] = blk_file  # backup file
 
                 kicad_sym_file = file.with_name(lib + "_old_lib.kicad_sym")
-                if kicad_sym_file.exists() and kicad_sym_file.is_file():
+                if existing(kicad_sym_file):
                     # Possible conversion name
                     entry["old_lib_kicad_sym"] = kicad_sym_file
 
@@ -112,7 +119,8 @@ def convert_lib(SRC: Path, DES: Path, drymode=True):
 
 def convert_lib_list(libs_dict, drymode=True):
 
-    if not cli.exists():
+    # a dry run only builds the list of file names, kicad-cli is not needed
+    if not drymode and not cli.exists():
         logger.error("kicad_cli not found! Conversion is not possible.")
         drymode = True
 
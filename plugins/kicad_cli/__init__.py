@@ -2,6 +2,9 @@ import subprocess
 
 
 class kicad_cli:
+    def __init__(self):
+        self.found = None  # result of exists(), kicad-cli is only probed once
+
     def run_kicad_cli(self, command):
         try:
             result = subprocess.run(
@@ -19,6 +22,11 @@ class kicad_cli:
             return None
 
     def exists(self):
+        if self.found is None:
+            self.found = self.check_version()
+        return self.found
+
+    def check_version(self):
 
         def version_to_tuple(version_str):
             return tuple(map(int, version_str.split(".")))